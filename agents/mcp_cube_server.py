@@ -1,4 +1,10 @@
 #!/usr/bin/env python3
+# /// script
+# dependencies = [
+#     "mcp",
+#     "numpy",
+# ]
+# ///
 """MCP Server for Cube Testing
 
 Provides tools for validating quantized cube data and testing
@@ -7,30 +13,313 @@ the 81×81×81 GIF cube vision with global palette verification.
 
 import asyncio
 import json
-import subprocess
+import os
+import re
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, FrozenSet, Iterator, List, Any, Optional
 
+import numpy as np
 from mcp import Server, Resource, Tool
 from mcp.types import TextContent, ImageContent
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to plain NumPy kernels
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; partial loads parse the whole file
+    ijson = None
+
+# Partial loads with ijson use less memory than a full parse but are slower
+# than orjson, so they only replace the stdlib json fallback
+_PARTIAL_LOADS = orjson is None and ijson is not None
+
 
 server = Server("cube-testing-server")
 
+# Top-level cube fields read by compare_cubes
+_COMPARE_FIELDS = frozenset({
+    "global_palette", "indexed_frames", "metadata", "temporal_metrics"
+})
+
+# Parsed cube files, keyed on ((path, mtime_ns, size), fields); bounded LRU
+_CUBE_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_CUBE_CACHE_SIZE = 8
+
+# One line per test in `cargo test` output, e.g. "test cube_tests::shape ... ok"
+_TEST_RESULT_RE = re.compile(r"^test \S+ \.\.\. (ok|FAILED|ignored)", re.MULTILINE)
+
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(
+            obj, separators=(",", ":"), default=lambda o: o.tolist()
+        ).encode()
+
+
+def _frames_array(frames: List[List[int]]) -> np.ndarray:
+    """Stack indexed frames into a (frames, pixels) integer array
+
+    Frames are converted without a target dtype: forcing an integer dtype
+    would silently truncate float indices. Frames that don't stack into an
+    integer array (ragged frames, non-integer indices or indices beyond
+    int64) raise ValueError, leaving them to the Python slow paths.
+    """
+    if not len(frames):
+        return np.zeros((0, 0), dtype=int)
+    arr = np.asarray(frames)
+    if arr.dtype.kind not in "iu":
+        raise ValueError(f"Palette indices must be integers, got {arr.dtype}")
+    return arr.reshape(len(frames), -1)
+
+
+def _any_out_of_range(flat: np.ndarray, max_index: int) -> bool:
+    """Fast check for palette indices outside [0, max_index]
+
+    Signed indices are viewed as unsigned, so negative values wrap above
+    max_index and one comparison checks both bounds.
+    """
+    if max_index < 0:
+        return flat.size > 0
+    if flat.dtype.kind == "i":
+        if max_index >= np.iinfo(flat.dtype).max:
+            return bool((flat < 0).any())
+        flat = flat.view(np.dtype(f"u{flat.itemsize}"))
+    return bool((flat > max_index).any())
+
+
+def _frame_drifts(frames: np.ndarray) -> np.ndarray:
+    """Fraction of pixels that changed between each pair of consecutive frames"""
+    changed = np.count_nonzero(frames[1:] != frames[:-1], axis=1)
+    return changed / max(frames.shape[1], 1)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _compute_all_metrics(
+        frames: np.ndarray, palette_len: int, with_drift: bool
+    ) -> tuple:
+        """Compute palette usage, frame drift and index validity in one pass
+
+        Returns (usage, drifts, out_of_range), where drifts[i] is the
+        fraction of pixels that changed between frames i and i + 1. Without
+        with_drift the previous frame is never read and drifts is empty.
+        """
+        n_frames, n_pixels = frames.shape
+        counts = np.zeros((n_frames, palette_len), np.int64)
+        changed = np.zeros(n_frames, np.int64)
+        bad = np.zeros(n_frames, np.bool_)
+        for i in prange(n_frames):
+            # Each frame owns its histogram row, merged after the loop
+            frame_counts = counts[i]
+            frame_changed = 0
+            frame_bad = False
+            for j in range(n_pixels):
+                index = frames[i, j]
+                if index < 0 or index >= palette_len:
+                    frame_bad = True
+                else:
+                    frame_counts[index] += 1
+                if with_drift and i > 0 and frames[i - 1, j] != index:
+                    frame_changed += 1
+            changed[i] = frame_changed
+            bad[i] = frame_bad
+        if with_drift:
+            drifts = changed[1:] / max(n_pixels, 1)
+        else:
+            drifts = np.zeros(0)
+        return counts.sum(axis=0), drifts, bad.any()
+else:
+    def _compute_all_metrics(
+        frames: np.ndarray, palette_len: int, with_drift: bool
+    ) -> tuple:
+        """Compute palette usage, frame drift and index validity
+
+        Returns (usage, drifts, out_of_range), where drifts[i] is the
+        fraction of pixels that changed between frames i and i + 1. Without
+        with_drift the frames are not compared and drifts is empty.
+        """
+        drifts = _frame_drifts(frames) if with_drift else np.zeros(0)
+        if _any_out_of_range(frames.ravel(), palette_len - 1):
+            return np.zeros(palette_len, np.int64), drifts, True
+        return np.bincount(frames.ravel(), minlength=palette_len), drifts, False
+
+
+def _warm_kernels() -> None:
+    """Compile the Numba kernels before serving so no tool call blocks on JIT
+
+    Indices parsed from JSON stack into NumPy's default integer dtype, so
+    that is the signature tool calls hit.
+    """
+    if njit is None:
+        return
+    _compute_all_metrics(np.zeros((2, 1), dtype=int), 1, True)
+
+
+def _changed_fraction(frames1: List[List[int]], frames2: List[List[int]]) -> np.ndarray:
+    """Fraction of changed pixels for each pair of frames (slow path)
+
+    Frames may have any length: pixels are compared over the common length
+    of each pair and divided by the length of the frame from frames1.
+    """
+    fractions = []
+    for f1, f2 in zip(frames1, frames2):
+        n = min(len(f1), len(f2))
+        changed = np.count_nonzero(np.asarray(f1[:n]) != np.asarray(f2[:n]))
+        fractions.append(changed / len(f1) if len(f1) else 0)
+    return np.asarray(fractions, dtype=np.float64)
+
+
+def _palette_distance(palette1: List[List[float]], palette2: List[List[float]]) -> float:
+    """Sum of RGB distances between paired palette colors
+
+    Colors are compared over the channels both share, so RGB and RGBA
+    palettes can be compared; palettes whose colors don't stack into a
+    2-D array are compared color by color.
+    """
+    n = min(len(palette1), len(palette2))
+    if not n:
+        return 0.0
+    try:
+        p1 = np.asarray(palette1[:n], dtype=np.float32).reshape(n, -1)
+        p2 = np.asarray(palette2[:n], dtype=np.float32).reshape(n, -1)
+    except ValueError:
+        return float(sum(
+            sum((a - b) ** 2 for a, b in zip(c1, c2)) ** 0.5
+            for c1, c2 in zip(palette1, palette2)
+        ))
+    channels = min(p1.shape[1], p2.shape[1])
+    return float(np.linalg.norm(p1[:, :channels] - p2[:, :channels], axis=1).sum())
+
+
+def _find_invalid_index(frames: List[List[int]], max_index: int) -> tuple:
+    """Locate the first non-integer or out-of-range palette index (slow path)"""
+    for frame_idx, frame in enumerate(frames):
+        for pixel_idx, index in enumerate(frame):
+            if not isinstance(index, int) or index < 0 or index > max_index:
+                return frame_idx, pixel_idx, index
+
+
+def _smallest_k_per_row(keys: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k smallest keys in each row, in ascending order"""
+    k = min(k, keys.shape[1])
+    part = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(keys, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def _load_cube(cube_path: str, fields: Optional[FrozenSet[str]] = None) -> dict:
+    """Load a cube JSON file, reusing the parsed data while the file is unchanged
+
+    When fields is given, only those top-level keys are guaranteed to be
+    present; they are the only ones parsed if partial loads are enabled.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    if not _PARTIAL_LOADS:
+        fields = None
+    path = os.path.abspath(cube_path)
+    stat = os.stat(path)
+    file_key = (path, stat.st_mtime_ns, stat.st_size)
+    
+    # A full load serves any subset of fields, so prefer it when cached
+    for key in ((file_key, None), (file_key, fields)):
+        if key in _CUBE_CACHE:
+            _CUBE_CACHE.move_to_end(key)
+            return _CUBE_CACHE[key]
+    
+    cube_data = _parse_cube(path, fields)
+    _CUBE_CACHE[(file_key, fields)] = cube_data
+    if len(_CUBE_CACHE) > _CUBE_CACHE_SIZE:
+        _CUBE_CACHE.popitem(last=False)
+    return cube_data
+
+
+def _parse_cube(path: str, fields: Optional[FrozenSet[str]]) -> dict:
+    with open(path, 'rb') as f:
+        if fields is not None:
+            # Stream the top-level keys and keep only the requested ones.
+            # kvitems still builds each value in full before it is dropped,
+            # so this bounds memory rather than saving parse work.
+            cube_data = {
+                key: value
+                for key, value in ijson.kvitems(f, "", use_float=True)
+                if key in fields
+            }
+        else:
+            cube_data = _json_loads(f.read())
+    
+    # Convert frames once so every tool call on this file can reuse them
+    try:
+        cube_data["_frames_np"] = _frames_array(cube_data.get("indexed_frames", []))
+    except ValueError:
+        cube_data["_frames_np"] = None  # Ragged frames, reported by validation
+    return cube_data
+
+
+def _write_json_object(f, fields: Dict[str, Any]) -> None:
+    """Write a compact JSON object, streaming iterator values row by row
+
+    Rows given as bytes are treated as already-encoded JSON.
+    """
+    f.write(b"{")
+    for field_idx, (key, value) in enumerate(fields.items()):
+        if field_idx:
+            f.write(b",")
+        f.write(_json_dumps(key) + b":")
+        if isinstance(value, Iterator):
+            f.write(b"[")
+            for row_idx, row in enumerate(value):
+                if row_idx:
+                    f.write(b",")
+                f.write(row if isinstance(row, bytes) else _json_dumps(row))
+            f.write(b"]")
+        else:
+            f.write(_json_dumps(value))
+    f.write(b"}")
+
+
+async def _run_cargo(*args: str) -> tuple:
+    """Run cargo in rust-core without blocking the event loop
+
+    Returns (returncode, stdout, stderr) with the output decoded as text.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "cargo", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=Path(__file__).parent.parent / "rust-core"
+    )
+    stdout, stderr = await proc.communicate()
+    return (
+        proc.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace")
+    )
+
 
 @server.resource("/quantized_cube_data")
 async def get_quantized_data() -> Resource:
     """Provide quantized cube data for testing"""
-    result = subprocess.run(
-        ["cargo", "run", "--bin", "generate_cube_data"],
-        capture_output=True,
-        text=True,
-        cwd=Path(__file__).parent.parent / "rust-core"
-    )
+    _, stdout, _ = await _run_cargo("run", "--bin", "generate_cube_data")
     return Resource(
         uri="/quantized_cube_data",
         name="Quantized Cube Data",
-        content=TextContent(text=result.stdout)
+        content=TextContent(text=stdout)
     )
 
 
@@ -42,21 +331,30 @@ async def validate_palette(data: dict) -> dict:
     
     # Validate palette is shared
     max_index = len(palette) - 1
-    for frame_idx, frame in enumerate(frames):
-        for pixel_idx, index in enumerate(frame):
-            if index > max_index:
-                return {
-                    "valid": False,
-                    "error": f"Frame {frame_idx} pixel {pixel_idx} has invalid index {index}"
-                }
+    invalid = None
+    try:
+        frames_np = _frames_array(frames)
+    except ValueError:
+        # Ragged frames or indices that aren't all integers: check the
+        # indices in Python, then count usage over all pixels as a single
+        # row since it doesn't depend on frame boundaries
+        invalid = _find_invalid_index(frames, max_index)
+        frames_np = None if invalid else np.asarray(
+            [[index for frame in frames for index in frame]], dtype=int
+        )
+    if frames_np is not None:
+        usage, _, out_of_range = _compute_all_metrics(frames_np, len(palette), False)
+        if out_of_range:
+            invalid = _find_invalid_index(frames, max_index)
+    if invalid:
+        frame_idx, pixel_idx, index = invalid
+        return {
+            "valid": False,
+            "error": f"Frame {frame_idx} pixel {pixel_idx} has invalid index {index}"
+        }
     
     # Calculate usage
-    usage = [0] * len(palette)
-    for frame in frames:
-        for index in frame:
-            usage[index] += 1
-    
-    unused = sum(1 for u in usage if u == 0)
+    unused = int((usage == 0).sum())
     utilization = (len(palette) - unused) / len(palette)
     
     return {
@@ -72,30 +370,39 @@ async def measure_temporal_drift(data: dict) -> dict:
     """Measure frame-to-frame palette drift"""
     frames = data.get("indexed_frames", [])
     
-    drifts = []
-    for i in range(1, len(frames)):
-        prev_frame = frames[i-1]
-        curr_frame = frames[i]
-        
-        # Count changed pixels
-        changed = sum(1 for p, c in zip(prev_frame, curr_frame) if p != c)
-        drift = changed / len(prev_frame)
-        drifts.append(drift)
+    if len(frames) < 2:
+        return {
+            "meanDrift": 0,
+            "maxDrift": 0,
+            "frameCount": len(frames),
+            "drifts": []
+        }
+    
+    # Fraction of changed pixels between consecutive frames
+    try:
+        frames_np = _frames_array(frames)
+    except ValueError:
+        drifts = _changed_fraction(frames[:-1], frames[1:])
+    else:
+        drifts = _frame_drifts(frames_np)
     
     return {
-        "meanDrift": sum(drifts) / len(drifts) if drifts else 0,
-        "maxDrift": max(drifts) if drifts else 0,
+        "meanDrift": float(drifts.mean()),
+        "maxDrift": float(drifts.max()),
         "frameCount": len(frames),
-        "drifts": drifts[:10]  # First 10 for inspection
+        "drifts": drifts[:10].tolist()  # First 10 for inspection
     }
 
 
 @server.tool("validate_cube_structure")
 async def validate_cube_structure(cube_path: str) -> dict:
-    """Validate a quantized cube JSON file"""
+    """Validate a quantized cube JSON file
+
+    For well-formed 81×81×81 cubes the metrics also include the measured
+    meanDrift and, when every index is valid, unusedColors.
+    """
     try:
-        with open(cube_path, 'r') as f:
-            cube_data = json.load(f)
+        cube_data = _load_cube(cube_path)
         
         # Structural validation
         errors = []
@@ -116,6 +423,20 @@ async def validate_cube_structure(cube_path: str) -> dict:
         if palette_size > 256:
             errors.append(f"Palette has {palette_size} colors, max is 256")
         
+        # Check palette indices, usage and drift in one pass over well-formed frames
+        scan_metrics = {}
+        frames_np = cube_data["_frames_np"]
+        if not errors and frames_np is not None and frames_np.shape == (81, 81 * 81):
+            usage, drifts, out_of_range = _compute_all_metrics(frames_np, palette_size, True)
+            scan_metrics["meanDrift"] = float(drifts.mean())
+            if out_of_range:
+                frame_idx, pixel_idx, index = _find_invalid_index(
+                    cube_data["indexed_frames"], palette_size - 1
+                )
+                errors.append(f"Frame {frame_idx} pixel {pixel_idx} has invalid index {index}")
+            else:
+                scan_metrics["unusedColors"] = int((usage == 0).sum())
+        
         # Check temporal metrics
         temporal = cube_data.get("temporal_metrics", {})
         stability = temporal.get("palette_stability", 0)
@@ -141,7 +462,8 @@ async def validate_cube_structure(cube_path: str) -> dict:
                 "paletteSize": palette_size,
                 "stability": stability,
                 "meanDeltaE": mean_delta_e,
-                "p95DeltaE": p95_delta_e
+                "p95DeltaE": p95_delta_e,
+                **scan_metrics
             }
         }
     except Exception as e:
@@ -156,31 +478,43 @@ async def validate_cube_structure(cube_path: str) -> dict:
 @server.tool("run_cube_tests")
 async def run_cube_tests() -> dict:
     """Run the Rust cube validation tests"""
-    result = subprocess.run(
-        ["cargo", "test", "-p", "m2-quant", "cube_tests", "--", "--nocapture"],
-        capture_output=True,
-        text=True,
-        cwd=Path(__file__).parent.parent / "rust-core"
+    returncode, stdout, stderr = await _run_cargo(
+        "test", "-p", "m2-quant", "cube_tests", "--", "--nocapture"
     )
+    results = Counter(_TEST_RESULT_RE.findall(stdout))
     
     return {
-        "success": result.returncode == 0,
-        "stdout": result.stdout,
-        "stderr": result.stderr,
-        "testsRun": result.stdout.count("test "),
-        "testsPassed": result.stdout.count("ok"),
-        "testsFailed": result.stdout.count("FAILED")
+        "success": returncode == 0,
+        "stdout": stdout,
+        "stderr": stderr,
+        "testsRun": results["ok"] + results["FAILED"],
+        "testsPassed": results["ok"],
+        "testsFailed": results["FAILED"]
     }
 
 
 @server.tool("generate_test_cube")
 async def generate_test_cube(output_path: str) -> dict:
     """Generate a test cube with known properties"""
-    # Generate synthetic test data
+    # Generate 81 frames with a shifting gradient pattern, shape (frame, y, x)
+    x = np.arange(81)
+    y = x[:, None]
+    f = x[:, None, None]
+    cube = (((x + y + f) * 256 // 162) % 256).astype(np.uint8)
+    frames_np = cube.reshape(81, -1)
+    usage = np.stack([np.bincount(frame, minlength=256) for frame in frames_np])
+    
+    # Simple attention map (center-weighted); it is identical for every
+    # frame, so it is computed and encoded once and written 81 times
+    attention = np.clip(1 - np.hypot(x - 40, y - 40) / 57, 0, None).ravel()
+    attention_json = _json_dumps(attention)
+    
+    # Generate synthetic test data; the per-pixel arrays are generators so
+    # they are serialized one frame at a time instead of held in memory
     cube_data = {
         "global_palette": [[i, i, i] for i in range(256)],  # Grayscale palette
-        "indexed_frames": [],
-        "attention_maps": [],
+        "indexed_frames": iter(frames_np),
+        "attention_maps": (attention_json for _ in range(81)),
         "palette_usage": [],
         "temporal_metrics": {
             "palette_stability": 0.95,
@@ -197,47 +531,36 @@ async def generate_test_cube(output_path: str) -> dict:
         }
     }
     
-    # Generate 81 frames with gradient pattern
+    # Rank colors for the whole cube at once. Keys are unique per frame:
+    # frequency first, then the lower palette index wins ties. Unused colors
+    # are pushed to the end of the least-frequent ranking.
+    index = np.arange(256)
+    most = _smallest_k_per_row(-(usage * 256 + 255 - index), 5)
+    least = _smallest_k_per_row(
+        np.where(usage > 0, usage * 256 + index, np.iinfo(np.int64).max), 5
+    )
+    frequency = usage / (81 * 81)
+    colors_used = np.count_nonzero(usage, axis=1)
+    
     for frame_idx in range(81):
-        frame = []
-        usage_counts = [0] * 256
-        
-        for y in range(81):
-            for x in range(81):
-                # Create a shifting gradient pattern
-                index = ((x + y + frame_idx) * 256 // 162) % 256
-                frame.append(index)
-                usage_counts[index] += 1
-        
-        cube_data["indexed_frames"].append(frame)
-        
-        # Calculate usage stats
-        colors_used = sum(1 for c in usage_counts if c > 0)
-        total_pixels = 81 * 81
-        most_frequent = sorted(
-            [(i, c/total_pixels) for i, c in enumerate(usage_counts) if c > 0],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-        
+        frame_usage = usage[frame_idx]
+        frame_frequency = frequency[frame_idx]
         cube_data["palette_usage"].append({
             "frame_index": frame_idx,
-            "colors_used": colors_used,
-            "most_frequent": most_frequent,
-            "least_frequent": most_frequent[-5:] if len(most_frequent) > 5 else []
+            "colors_used": int(colors_used[frame_idx]),
+            "most_frequent": [
+                (int(i), float(frame_frequency[i]))
+                for i in most[frame_idx] if frame_usage[i]
+            ],
+            "least_frequent": [
+                (int(i), float(frame_frequency[i]))
+                for i in least[frame_idx] if frame_usage[i]
+            ]
         })
-        
-        # Simple attention map (center-weighted)
-        attention = []
-        for y in range(81):
-            for x in range(81):
-                dist = ((x - 40) ** 2 + (y - 40) ** 2) ** 0.5
-                attention.append(max(0, 1 - dist / 57))
-        cube_data["attention_maps"].append(attention)
     
     # Write to file
-    with open(output_path, 'w') as f:
-        json.dump(cube_data, f, indent=2)
+    with open(output_path, 'wb') as f:
+        _write_json_object(f, cube_data)
     
     return {
         "success": True,
@@ -251,32 +574,31 @@ async def generate_test_cube(output_path: str) -> dict:
 async def compare_cubes(cube1_path: str, cube2_path: str) -> dict:
     """Compare two quantized cube data files"""
     try:
-        with open(cube1_path, 'r') as f:
-            cube1 = json.load(f)
-        with open(cube2_path, 'r') as f:
-            cube2 = json.load(f)
+        cube1 = _load_cube(cube1_path, _COMPARE_FIELDS)
+        cube2 = _load_cube(cube2_path, _COMPARE_FIELDS)
         
         # Compare palettes
         palette1 = cube1.get("global_palette", [])
         palette2 = cube2.get("global_palette", [])
         
-        palette_diff = 0
-        for c1, c2 in zip(palette1, palette2):
-            # Simple RGB distance
-            diff = sum((a - b) ** 2 for a, b in zip(c1, c2)) ** 0.5
-            palette_diff += diff
-        
+        palette_diff = _palette_distance(palette1, palette2)
         if palette1:
             palette_diff /= len(palette1)
         
         # Compare frames
-        frames1 = cube1.get("indexed_frames", [])
-        frames2 = cube2.get("indexed_frames", [])
-        
-        frame_diffs = []
-        for f1, f2 in zip(frames1, frames2):
-            changed = sum(1 for p1, p2 in zip(f1, f2) if p1 != p2)
-            frame_diffs.append(changed / len(f1) if f1 else 0)
+        frames1 = cube1["_frames_np"]
+        frames2 = cube2["_frames_np"]
+        if frames1 is None or frames2 is None:
+            # Ragged frames can't be stacked; compare them row by row
+            frames1 = cube1.get("indexed_frames", [])
+            frames2 = cube2.get("indexed_frames", [])
+            n = min(len(frames1), len(frames2))
+            frame_diffs = _changed_fraction(frames1, frames2)
+        else:
+            n = min(len(frames1), len(frames2))
+            pixels = min(frames1.shape[1], frames2.shape[1])
+            changed = np.count_nonzero(frames1[:n, :pixels] != frames2[:n, :pixels], axis=1)
+            frame_diffs = changed / max(frames1.shape[1], 1)
         
         # Compare metrics
         meta1 = cube1.get("metadata", {})
@@ -284,8 +606,8 @@ async def compare_cubes(cube1_path: str, cube2_path: str) -> dict:
         
         return {
             "paletteDifference": palette_diff,
-            "averageFrameDifference": sum(frame_diffs) / len(frame_diffs) if frame_diffs else 0,
-            "maxFrameDifference": max(frame_diffs) if frame_diffs else 0,
+            "averageFrameDifference": float(frame_diffs.mean()) if n else 0,
+            "maxFrameDifference": float(frame_diffs.max()) if n else 0,
             "deltaEDifference": abs(
                 meta1.get("mean_delta_e", 0) - meta2.get("mean_delta_e", 0)
             ),
@@ -301,4 +623,5 @@ async def compare_cubes(cube1_path: str, cube2_path: str) -> dict:
 
 
 if __name__ == "__main__":
+    _warm_kernels()
     asyncio.run(server.run())
\ No newline at end of file
@@ -4,25 +4,48 @@ GIF89a Validation Utility
 Parses a GIF file and reports header, frame count, delays, palette sizes, and loop flag
 """
 
+import mmap
+import os
 import sys
 import struct
 
+# Precompiled little-endian formats for the fixed-layout GIF fields
+_U16 = struct.Struct('<H').unpack_from
+_IMGDESC = struct.Struct('<HHHHB').unpack_from  # left, top, width, height, packed
+
+def _skip_sub_blocks(data, pos, end):
+    """Skip a chain of data sub-blocks, returning the position after its terminator"""
+    while pos < end and (size := data[pos]):
+        pos += size + 1
+    return pos + 1
+
 def parse_gif89a(filepath):
     """Parse GIF89a file and extract key metadata"""
     try:
         with open(filepath, 'rb') as f:
-            data = f.read()
+            if os.fstat(f.fileno()).st_size < 13:
+                return {"error": "File too small to be a valid GIF"}
+            # Map the file instead of reading it: the parser only touches
+            # block headers, so most of the LZW data is never paged in
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     except FileNotFoundError:
         return {"error": f"File not found: {filepath}"}
     except Exception as e:
         return {"error": f"Could not read file: {e}"}
     
-    if len(data) < 13:
-        return {"error": "File too small to be a valid GIF"}
-    
+    # Parse through a memoryview so slices are zero-copy views
+    view = memoryview(data)
+    try:
+        return _parse_gif_data(view)
+    finally:
+        view.release()
+        data.close()
+
+def _parse_gif_data(data):
+    """Parse GIF89a data from a bytes-like buffer"""
     # Parse header
-    signature = data[0:3].decode('ascii', errors='ignore')
-    version = data[3:6].decode('ascii', errors='ignore')
+    signature = str(data[0:3], 'ascii', errors='ignore')
+    version = str(data[3:6], 'ascii', errors='ignore')
     
     if signature != 'GIF':
         return {"error": f"Invalid signature: {signature} (expected GIF)"}
@@ -30,8 +53,8 @@ def parse_gif89a(filepath):
     header = f"{signature}{version}"
     
     # Parse Logical Screen Descriptor
-    width = struct.unpack('<H', data[6:8])[0]
-    height = struct.unpack('<H', data[8:10])[0]
+    width = _U16(data, 6)[0]
+    height = _U16(data, 8)[0]
     packed = data[10]
     global_color_table_flag = bool(packed & 0x80)
     global_color_table_size = 2 << (packed & 0x07) if global_color_table_flag else 0
@@ -45,7 +68,8 @@ def parse_gif89a(filepath):
     loop_present = False
     
     # Parse data stream
-    while pos < len(data):
+    end = len(data)
+    while pos < end:
         if data[pos] == 0x21:  # Extension
             ext_type = data[pos + 1]
             pos += 2
@@ -54,23 +78,22 @@ def parse_gif89a(filepath):
                 block_size = data[pos]
                 pos += 1
                 if block_size >= 11:
-                    app_id = data[pos:pos+11].decode('ascii', errors='ignore')
+                    # Compare in place; a slice kept alive would pin the mmap
+                    is_netscape = data[pos:pos+11] == b'NETSCAPE2.0'
                     pos += 11
-                    if app_id == 'NETSCAPE2.0':
+                    if is_netscape:
                         loop_present = True
                         # Parse loop count
-                        while pos < len(data) and data[pos] != 0:
+                        while pos < end and data[pos] != 0:
                             sub_block_size = data[pos]
                             pos += 1
                             if sub_block_size >= 3 and data[pos] == 1:  # Loop extension
-                                loop_count = struct.unpack('<H', data[pos+1:pos+3])[0]
+                                loop_count = _U16(data, pos + 1)[0]
                             pos += sub_block_size
                         pos += 1  # Skip terminator
                     else:
                         # Skip unknown application extension
-                        while pos < len(data) and data[pos] != 0:
-                            pos += data[pos] + 1
-                        pos += 1
+                        pos = _skip_sub_blocks(data, pos, end)
                 else:
                     pos += block_size
             
@@ -79,7 +102,7 @@ def parse_gif89a(filepath):
                 pos += 1
                 if block_size >= 4:
                     disposal = (data[pos] >> 2) & 0x07
-                    delay = struct.unpack('<H', data[pos+1:pos+3])[0]  # in centiseconds
+                    delay = _U16(data, pos + 1)[0]  # in centiseconds
                     transparent_index = data[pos+3]
                     transparent_flag = bool(data[pos] & 0x01)
                     pos += 4
@@ -89,17 +112,11 @@ def parse_gif89a(filepath):
             
             else:
                 # Skip other extensions
-                while pos < len(data) and data[pos] != 0:
-                    pos += data[pos] + 1
-                pos += 1
+                pos = _skip_sub_blocks(data, pos, end)
         
         elif data[pos] == 0x2C:  # Image Descriptor
             pos += 1  # Skip separator
-            left = struct.unpack('<H', data[pos:pos+2])[0]
-            top = struct.unpack('<H', data[pos+2:pos+4])[0]
-            img_width = struct.unpack('<H', data[pos+4:pos+6])[0]
-            img_height = struct.unpack('<H', data[pos+6:pos+8])[0]
-            packed = data[pos+8]
+            left, top, img_width, img_height, packed = _IMGDESC(data, pos)
             pos += 9
             
             local_color_table_flag = bool(packed & 0x80)
@@ -123,10 +140,8 @@ def parse_gif89a(filepath):
             # Skip LZW minimum code size
             pos += 1
             
-            # Skip image data sub-blocks
-            while pos < len(data) and data[pos] != 0:
-                pos += data[pos] + 1
-            pos += 1  # Skip terminator
+            # Skip image data sub-blocks and terminator
+            pos = _skip_sub_blocks(data, pos, end)
         
         elif data[pos] == 0x3B:  # Trailer
             break